@@ -6,17 +6,24 @@ Summarize chunks & extract obligations, rights, risks, penalties, and dates
 
 import os
 import time
-from pathlib import Path
-import google.generativeai as genai
 
-# --------- Configure Gemini API ---------
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    raise ValueError("⚠️ GOOGLE_API_KEY not found. Set it before running the script.")
-genai.configure(api_key=api_key)
+# --------- Configure Gemini API & model selection ---------
+# Done on first use so importing this module stays cheap.
+_model = None
+MODEL_NAME = "models/gemini-2.5-pro"
 
-# --------- Model selection ---------
-model = genai.GenerativeModel("models/gemini-2.5-pro")
+
+def get_model():
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("⚠️ GOOGLE_API_KEY not found. Set it before running the script.")
+        genai.configure(api_key=api_key)
+        _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
 
 # --------- Function to process a chunk ---------
 def process_chunk(chunk: str) -> str:
@@ -32,35 +39,41 @@ def process_chunk(chunk: str) -> str:
     {chunk}
     """
 
-    response = model.generate_content(prompt)
+    response = get_model().generate_content(prompt)
     return response.text.strip()
 
 # --------- Main Program ---------
 if __name__ == "__main__":
-    chunks_dir = Path("chunks")
-    output_dir = Path("gemini_ai_summaries")
-    output_dir.mkdir(exist_ok=True)
+    from contextlib import closing
+
+    from document_store import STORE_DB, connect, pending_chunks, put_summaries
 
-    if not chunks_dir.exists():
-        print("⚠️ No 'chunks/' folder found. Run preprocessing first.")
-        exit()
+    with closing(connect()) as conn:
+        chunks = pending_chunks(conn, "gemini", MODEL_NAME)
+        if not chunks:
+            print(f"⚠️ No unsummarized chunks in {STORE_DB}. Run preprocessing first.")
+            exit()
 
-    chunk_files = sorted(chunks_dir.glob("chunk_*.txt"))
-    print(f"Found {len(chunk_files)} chunks. Processing...")
+        print(f"Found {len(chunks)} chunks. Processing...")
 
-    for i, chunk_file in enumerate(chunk_files, start=1):
-        text = chunk_file.read_text(encoding="utf-8")
+        summaries = []
+        for i, chunk in enumerate(chunks, start=1):
+            for attempt in range(3):
+                try:
+                    simplified = process_chunk(chunk["text"])
+                    summaries.append((chunk["hash"], simplified, "gemini", MODEL_NAME))
+                    print(f"✅ Processed chunk {i}/{len(chunks)}")
+                    break
+                except Exception as e:
+                    print(f"❌ Error processing chunk {i}, attempt {attempt+1}: {e}")
+                    time.sleep(3)
+            else:
+                print(f"⚠️ Failed to process chunk {i} after 3 attempts.")
 
-        for attempt in range(3):
-            try:
-                simplified = process_chunk(text)
-                (output_dir / f"simplified_{i}.txt").write_text(simplified, encoding="utf-8")
-                print(f"✅ Processed chunk {i}/{len(chunk_files)}")
-                break
-            except Exception as e:
-                print(f"❌ Error processing chunk {i}, attempt {attempt+1}: {e}")
-                time.sleep(3)
-        else:
-            print(f"⚠️ Failed to process chunk {i} after 3 attempts.")
+            # Write in batches so an interrupted run keeps its progress
+            if len(summaries) >= 20:
+                put_summaries(conn, summaries)
+                summaries = []
+        put_summaries(conn, summaries)
 
-    print("\n🎉 Summaries saved in 'gemini_ai_summaries/' folder")
+    print(f"\n🎉 Summaries saved in {STORE_DB}")
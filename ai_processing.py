@@ -6,14 +6,23 @@ Summarize chunks & extract obligations, rights, risks, penalties, and dates
 
 import os
 import time
-from pathlib import Path
-from openai import OpenAI
 
 # --------- Configure OpenAI API ---------
 # Make sure you set your API key before running:
 #   setx OPENAI_API_KEY "your_api_key"   (Windows permanent)
 #   $env:OPENAI_API_KEY="your_api_key"   (PowerShell temporary)
-client = OpenAI(base_url="http://localhost:11434/v1", api_key="ollama")
+# The client is created on first use so importing this module stays cheap.
+_client = None
+MODEL_NAME = "phi"  # or "gpt-4o"
+
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        _client = OpenAI(base_url="http://localhost:11434/v1", api_key="ollama")
+    return _client
 
 
 # --------- Function to process a chunk ---------
@@ -30,8 +39,8 @@ def process_chunk(chunk: str) -> str:
     {chunk}
     """
 
-    response = client.chat.completions.create(
-        model="phi",  # or "gpt-4o"
+    response = get_client().chat.completions.create(
+        model=MODEL_NAME,
         messages=[
             {"role": "system", "content": "You simplify legal documents into clear summaries."},
             {"role": "user", "content": prompt}
@@ -44,31 +53,37 @@ def process_chunk(chunk: str) -> str:
 
 # --------- Main Program ---------
 if __name__ == "__main__":
-    chunks_dir = Path("chunks")
-    output_dir = Path("ai_summaries")
-    output_dir.mkdir(exist_ok=True)
-
-    if not chunks_dir.exists():
-        print("⚠️ No 'chunks/' folder found. Run preprocessing first.")
-        exit()
-
-    chunk_files = sorted(chunks_dir.glob("chunk_*.txt"))
-    print(f"Found {len(chunk_files)} chunks. Processing...")
-
-    for i, chunk_file in enumerate(chunk_files, start=1):
-        text = chunk_file.read_text(encoding="utf-8")
-
-        # Retry mechanism for stability
-        for attempt in range(3):
-            try:
-                simplified = process_chunk(text)
-                (output_dir / f"simplified_{i}.txt").write_text(simplified, encoding="utf-8")
-                print(f"✅ Processed chunk {i}/{len(chunk_files)}")
-                break
-            except Exception as e:
-                print(f"❌ Error processing chunk {i}, attempt {attempt+1}: {e}")
-                time.sleep(3)
-        else:
-            print(f"⚠️ Failed to process chunk {i} after 3 attempts.")
-
-    print(f"\n🎉 Summaries saved in 'ai_summaries/' folder")                                                     
\ No newline at end of file
+    from contextlib import closing
+
+    from document_store import STORE_DB, connect, pending_chunks, put_summaries
+
+    with closing(connect()) as conn:
+        chunks = pending_chunks(conn, "ollama", MODEL_NAME)
+        if not chunks:
+            print(f"⚠️ No unsummarized chunks in {STORE_DB}. Run preprocessing first.")
+            exit()
+
+        print(f"Found {len(chunks)} chunks. Processing...")
+
+        summaries = []
+        for i, chunk in enumerate(chunks, start=1):
+            # Retry mechanism for stability
+            for attempt in range(3):
+                try:
+                    simplified = process_chunk(chunk["text"])
+                    summaries.append((chunk["hash"], simplified, "ollama", MODEL_NAME))
+                    print(f"✅ Processed chunk {i}/{len(chunks)}")
+                    break
+                except Exception as e:
+                    print(f"❌ Error processing chunk {i}, attempt {attempt+1}: {e}")
+                    time.sleep(3)
+            else:
+                print(f"⚠️ Failed to process chunk {i} after 3 attempts.")
+
+            # Write in batches so an interrupted run keeps its progress
+            if len(summaries) >= 20:
+                put_summaries(conn, summaries)
+                summaries = []
+        put_summaries(conn, summaries)
+
+    print(f"\n🎉 Summaries saved in {STORE_DB}")
@@ -1,76 +1,63 @@
 # app.py
 """
 AI-Powered Contract & Policy Simplifier
-Using Ollama Phi model instead of Google Gemini
+Using the local Ollama Phi model (optionally failing over to cloud providers)
 """
 
+import json
 import os
-import re
-import fitz  # PyMuPDF
-from docx import Document
+import time
+from contextlib import closing
 from pathlib import Path
 import streamlit as st
-import ollama  
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-
-
-# --------- PDF Extraction ---------
-def extract_text_from_pdf(pdf_path: str) -> str:
-    text = ""
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            text += page.get_text("text") + "\n"
-    return text.strip()
-
-
-# --------- DOCX Extraction ---------
-def extract_text_from_docx(docx_path: str) -> str:
-    doc = Document(docx_path)
-    text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-    return text.strip()
-
-
-# --------- Cleaning ---------
-def clean_text(text: str) -> str:
-    text = re.sub(r"\s+", " ", text)
-    text = re.sub(r"[^\x00-\x7F]+", " ", text)
-    return text.strip()
-
-
-# --------- Chunking ---------
-def split_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> list:
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk.strip())
-        start += chunk_size - overlap
-    return chunks
-
-
-def process_chunk_with_ollama(chunk: str, model_name: str = "phi") -> str:
-    prompt = f"""
-    You are a legal document simplifier. Read the following text and:
-    1. Summarize it in plain, simple English.
-    2. List obligations, rights, risks, penalties, and critical dates clearly.
-
-    Text:
-    {chunk}
+from document_store import connect as connect_store, get_chunks, get_clean_text
+from job_queue import get_job, save_upload, start_workers, submit_job
+from preprocessing import format_pages
+
+
+# --------- CONFIGURE PROVIDERS ---------
+# Each chunk is routed through PROVIDER_ROUTE (Streamlit Secrets or
+# Environment). It is local-only by default; list cloud providers after
+# ollama (e.g. "ollama,groq") to hedge and fail over to them, with their
+# API keys in Secrets or Environment.
+# Documents are processed by background workers (see job_queue.py), which
+# read the keys from the environment they inherit. Started once per server.
+def setting(name: str, default: str = None) -> str:
     """
+    Reads a setting from the environment, then from Streamlit Secrets.
+    Running without a secrets.toml is fine.
+    """
+    value = os.getenv(name)
+    if value:
+        return value
     try:
-        response = ollama.chat(model=model_name, messages=[{"role": "user", "content": prompt}])
-        return response["message"]["content"].strip()
-    except Exception as e:
-        return f"⚠️ Error processing chunk: {e}"
+        return st.secrets.get(name) or default
+    except Exception:  # StreamlitSecretNotFoundError without a secrets.toml
+        return default
+
+
+PROVIDER_ROUTE = setting("PROVIDER_ROUTE", "ollama")
+
 
+@st.cache_resource
+def start_job_workers():
+    for name in ("GOOGLE_API_KEY", "GROQ_API_KEY"):
+        value = setting(name)
+        if value:
+            os.environ[name] = value
+    return start_workers()
 
 
+# Characters of cleaned text shown around a chunk in "Source of a Summary"
+SOURCE_CONTEXT = 300
+
 
 # --------- Export Functions ---------
 def export_to_pdf(input_text: str, output_path: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
     styles = getSampleStyleSheet()
     story = []
     for line in input_text.split("\n"):
@@ -85,6 +72,8 @@ def export_to_pdf(input_text: str, output_path: str):
 
 
 def export_to_docx(input_text: str, output_path: str):
+    from docx import Document
+
     doc = Document()
     for line in input_text.split("\n"):
         if line.startswith("###"):
@@ -105,37 +94,59 @@ uploaded_file = st.file_uploader(
     key="upload_contract"
 )
 
-if uploaded_file:
-    input_path = Path(uploaded_file.name)
-    with open(input_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-
-    if input_path.suffix.lower() == ".pdf":
-        raw_text = extract_text_from_pdf(str(input_path))
-    else:
-        raw_text = extract_text_from_docx(str(input_path))
-
-    cleaned_text = clean_text(raw_text)
-    chunks = split_text(cleaned_text)
+start_job_workers()
 
-    st.success(f"✅ Extracted {len(chunks)} chunks from {input_path.name}")
-
-    # Process with Ollama Phi
-    st.subheader("Processing with Ollama Phi Model...")
-    summaries = []
+if uploaded_file:
+    # A new upload becomes a new job; reruns for the same upload keep polling it
+    upload_key = f"{uploaded_file.name}:{uploaded_file.size}"
+    if st.session_state.get("upload_key") != upload_key:
+        input_path = save_upload(uploaded_file.name, uploaded_file.getbuffer())
+        try:
+            st.query_params["job"] = submit_job(str(input_path), provider="auto", route=PROVIDER_ROUTE)
+        except ValueError as e:
+            st.error(f"⚠️ Check the PROVIDER_ROUTE setting: {e}")
+            st.stop()
+        st.session_state["upload_key"] = upload_key
+
+# The job ID lives in the URL, so a user can close the tab and come back later
+job_id = st.query_params.get("job")
+if job_id:
+    job = get_job(job_id)
+    if job is None:
+        st.error(f"⚠️ Job {job_id} not found.")
+        st.stop()
+
+    # Process with the job's providers, in routing order
+    st.subheader(f"Processing with {(job['route'] or job['provider']).replace(',', ' → ')}...")
+    st.caption(f"Job ID: {job_id} (bookmark this page to come back to the result)")
     progress = st.progress(0)
-    for i, chunk in enumerate(chunks, start=1):
-        summary = process_chunk_with_ollama(chunk)
-        summaries.append(f"### Summary of Chunk {i}\n{summary}\n")
-        progress.progress(i / len(chunks))
-
-    final_summary = "\n\n".join(summaries)
+    while job["status"] in ("queued", "running"):
+        progress.progress(job["done"] / job["total"] if job["total"] else 0.0)
+        time.sleep(1)
+        job = get_job(job_id)
+
+    if job["status"] == "failed":
+        st.error(f"⚠️ Error processing document: {job['error']}")
+        st.stop()
+    progress.progress(1.0)
+
+    if job["extract_stats"]:
+        stats = json.loads(job["extract_stats"])
+        st.caption(f"🧹 Removed {stats['removed_lines']} repeated header/footer lines "
+                   f"({stats['removed_chars']} chars, ~{stats['removed_tokens']} tokens) before chunking")
+    st.success(f"✅ Processed {job['total']} chunks from {Path(job['file_path']).name}")
+    served_by = json.loads(job["served_by"] or "[]")
+    providers = dict.fromkeys(name for name in served_by if name)
+    if providers:
+        st.caption("🤖 Served by " + ", ".join(f"{name} ({served_by.count(name)} chunks)" for name in providers))
+
+    final_summary = job["result"]
 
     # Display in UI
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("📄 Original Document Preview")
-        st.text_area("Original", raw_text[:2000], height=400)
+        st.text_area("Original", job["preview"], height=400)
 
     with col2:
         st.subheader("✨ Simplified Summary")
@@ -147,14 +158,44 @@ if uploaded_file:
             st.write(f"Found {len(matches)} matches:")
             st.text("\n".join(matches[:20]))
 
-    # Export Files
-    Path("Final_Summary_Report.txt").write_text(final_summary, encoding="utf-8")
-    export_to_pdf(final_summary, "Final_Summary_Report.pdf")
-    export_to_docx(final_summary, "Final_Summary_Report.docx")
+    # Jump from a summary back to the exact span of the source it came from
+    if job["doc_hash"]:
+        with closing(connect_store()) as store:
+            sources = get_chunks(store, job["doc_hash"])
+            cleaned = get_clean_text(store, job["doc_hash"])
+        if sources:
+            st.subheader("🔎 Source of a Summary")
+            idx = st.selectbox("Show the source text of", [row["idx"] for row in sources],
+                               format_func=lambda i: f"Summary of Chunk {i}")
+            source = sources[idx - 1]
+            location = f"characters {source['start']}-{source['end']} of the cleaned text"
+            if source["page_start"]:
+                location = f"{format_pages(source['page_start'], source['page_end'])}, {location}"
+            if not cleaned or source["start"] is None:
+                location = "offsets not recorded"
+            served = served_by[idx - 1] if idx <= len(served_by) else None
+            st.caption(f"📍 Chunk {idx}: {location}" + (f" · summarized by {served}" if served else ""))
+            if cleaned and source["start"] is not None:
+                # Show the chunk in place, marked with >>> <<<, inside the cleaned text
+                start, end = source["start"], source["end"]
+                before = cleaned[max(0, start - SOURCE_CONTEXT):start]
+                after = cleaned[end:end + SOURCE_CONTEXT]
+                st.text_area("Source", f"…{before}>>> {cleaned[start:end]} <<<{after}…", height=200)
+                st.download_button("Download cleaned text", cleaned,
+                                   file_name=f"{Path(job['file_path']).stem}_cleaned.txt")
+            else:
+                st.text_area("Source", source["text"], height=200)
+
+    # Export Files (one set per job so concurrent users don't overwrite each other)
+    report = Path("reports") / job_id
+    report.mkdir(parents=True, exist_ok=True)
+    (report / "Final_Summary_Report.txt").write_text(final_summary, encoding="utf-8")
+    export_to_pdf(final_summary, str(report / "Final_Summary_Report.pdf"))
+    export_to_docx(final_summary, str(report / "Final_Summary_Report.docx"))
 
     st.subheader("⬇️ Export Options")
     st.download_button("Download TXT", final_summary, file_name="Final_Summary_Report.txt")
-    with open("Final_Summary_Report.pdf", "rb") as f:
+    with open(report / "Final_Summary_Report.pdf", "rb") as f:
         st.download_button("Download PDF", f, file_name="Final_Summary_Report.pdf")
-    with open("Final_Summary_Report.docx", "rb") as f:
+    with open(report / "Final_Summary_Report.docx", "rb") as f:
         st.download_button("Download DOCX", f, file_name="Final_Summary_Report.docx")
@@ -4,25 +4,290 @@ Step 1: Document Ingestion
 Extract text from PDF (using PyMuPDF) and DOCX, then save as TXT
 """
 
+import math
 import os
-import fitz  # PyMuPDF
-from docx import Document
+import re
+
+from preprocessing import PAGE_BREAK
+
+# A line is treated as a running header/footer when it sits in the page
+# margin on at least this share of the pages
+REPEAT_PAGE_RATIO = 0.5
+
+# Repeat detection needs at least this many pages to tell boilerplate apart
+MIN_REPEAT_PAGES = 3
+
+# Top and bottom share of the page height counted as header/footer margin
+MARGIN_RATIO = 0.08
+
+# Blocks wider than this share of the page span both columns
+FULL_WIDTH_RATIO = 0.6
+
+# Blocks whose tops are this close (in points) sit on the same row
+ROW_TOLERANCE = 3.0
+
+# PDF blocks carry no table structure, so a band of left/right blocks is
+# guessed to be a table when a row has TABLE_ROW_CELLS or more blocks, or when
+# most right-hand blocks line up with a left-hand one at both top and bottom
+# (within ROW_TOLERANCE), as cells of one row do. Side-by-side paragraphs only
+# share their tops, so they stay columns. Limits: a two-column table whose
+# cells wrap to different heights is read column by column, and side-by-side
+# paragraphs of exactly the same height are read row by row.
+TABLE_ROW_CELLS = 3
+
+PAGE_NUMBER_RE = re.compile(r"^[-\s]*(page\s*)?\d+(\s*(of|/)\s*\d+)?[-\s]*$", re.IGNORECASE)
+
+# Page-number-like tokens inside a line ("Page 3", "3 of 10", "3/10")
+PAGE_TOKEN_RE = re.compile(r"page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+")
+
+
+# --------- Layout helpers for PDF extraction ---------
+def _normalize_line(line: str) -> str:
+    # Only page numbers change from page to page; other digits must match
+    line = re.sub(r"\s+", " ", line.lower()).strip()
+    if PAGE_NUMBER_RE.match(line):
+        return "#"
+    return PAGE_TOKEN_RE.sub("#", line)
+
+
+def _looks_like_table(band: list, left: list, right: list) -> bool:
+    # See TABLE_ROW_CELLS for the heuristic and its limits
+    for block in band:
+        if sum(abs(other[1] - block[1]) <= ROW_TOLERANCE for other in band) >= TABLE_ROW_CELLS:
+            return True
+    cells = sum(any(abs(r[1] - l[1]) <= ROW_TOLERANCE and abs(r[3] - l[3]) <= ROW_TOLERANCE for l in left)
+                for r in right)
+    return cells * 2 > len(right)
+
+
+def _is_two_column(band: list, middle: float) -> bool:
+    """
+    A band is read as two columns only when every block stays on its side
+    of the midline, both sides overlap vertically, and it doesn't look like
+    a table.
+    """
+    left = [b for b in band if b[2] <= middle]
+    right = [b for b in band if b[0] >= middle]
+    if not left or not right or len(left) + len(right) != len(band):
+        return False
+    if min(max(b[3] for b in left), max(b[3] for b in right)) <= max(min(b[1] for b in left), min(b[1] for b in right)):
+        return False
+    return not _looks_like_table(band, left, right)
+
+
+def order_blocks(blocks: list, page_width: float) -> list:
+    """
+    Puts text blocks (x0, y0, x1, y1, text) into reading order.
+    Full-width blocks split the page into bands. A band that really has two
+    columns is read left column first, then right; anything else (single
+    column text, tables) is read top to bottom, left to right.
+    """
+    middle = page_width / 2
+    ordered, band = [], []
+
+    def flush():
+        if _is_two_column(band, middle):
+            band.sort(key=lambda b: (b[0] >= middle, b[1], b[0]))
+        ordered.extend(band)
+        band.clear()
+
+    for block in sorted(blocks, key=lambda b: (b[1], b[0])):
+        if block[2] - block[0] >= page_width * FULL_WIDTH_RATIO:
+            flush()
+            ordered.append(block)
+        else:
+            band.append(block)
+    flush()
+    return ordered
+
+
+def strip_repeating_lines(pages: list) -> tuple:
+    """
+    Drops running headers, footers, banners and page numbers. Each page is a
+    list of (line, in_margin) pairs, where in_margin says whether the line's
+    block lies in the top or bottom page margin; only those lines can be
+    removed. Repeats count only on documents of MIN_REPEAT_PAGES or more.
+    Returns the cleaned pages (lists of lines) and the stats of what was removed.
+    """
+    check_repeats = len(pages) >= MIN_REPEAT_PAGES
+    min_pages = math.ceil(len(pages) * REPEAT_PAGE_RATIO)
+    page_counts = {}
+    for lines in pages:
+        for key in {_normalize_line(line) for line, in_margin in lines if in_margin}:
+            page_counts[key] = page_counts.get(key, 0) + 1
+
+    cleaned, removed_lines, removed_chars = [], 0, 0
+    for lines in pages:
+        kept = []
+        for line, in_margin in lines:
+            key = _normalize_line(line)
+            if not key:
+                continue
+            repeated = check_repeats and page_counts.get(key, 0) >= min_pages
+            if in_margin and (repeated or PAGE_NUMBER_RE.match(line.strip())):
+                removed_lines += 1
+                removed_chars += len(line)
+            else:
+                kept.append(line)
+        cleaned.append(kept)
+
+    stats = {
+        "removed_lines": removed_lines,
+        "removed_chars": removed_chars,
+        # Rough estimate: ~4 characters per token for English text
+        "removed_tokens": removed_chars // 4,
+    }
+    return cleaned, stats
 
 
 # --------- Function to extract text from PDF (PyMuPDF) ---------
-def extract_text_from_pdf(pdf_path: str) -> str:
-    text = ""
+def extract_text_from_pdf_with_stats(pdf_path: str) -> tuple:
+    """
+    Block-level extraction in reading order, with repeating headers,
+    footers and page numbers removed. Returns (text, stats).
+    """
+    import fitz  # PyMuPDF
+
+    pages = []
     with fitz.open(pdf_path) as doc:
         for page in doc:
-            text += page.get_text("text") + "\n"
-    return text.strip()
+            # (x0, y0, x1, y1, text, block_no, block_type); type 0 is text
+            blocks = [b for b in page.get_text("blocks") if b[6] == 0]
+            margin = page.rect.height * MARGIN_RATIO
+            lines = []
+            for block in order_blocks(blocks, page.rect.width):
+                in_margin = block[3] <= margin or block[1] >= page.rect.height - margin
+                lines.extend((line, in_margin) for line in block[4].splitlines() if line.strip())
+            pages.append(lines)
+
+    pages, stats = strip_repeating_lines(pages)
+    # Every page, even a blank one, ends with a page break so chunks can be
+    # traced back to their page
+    text = "".join("\n".join(line.strip() for line in lines) + PAGE_BREAK for lines in pages)
+    return text, stats
+
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    return extract_text_from_pdf_with_stats(pdf_path)[0]
+
+
+# --------- Function to extract text from DOCX (streaming) ---------
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# Parts read besides the body, in the order they are emitted
+DOCX_PART_PATTERNS = {
+    "header": re.compile(r"^word/header(\d*)\.xml$"),
+    "footnotes": re.compile(r"^word/footnotes\.xml$"),
+    "endnotes": re.compile(r"^word/endnotes\.xml$"),
+    "footer": re.compile(r"^word/footer(\d*)\.xml$"),
+}
+
+
+def _iter_docx_part(stream):
+    """
+    Streams one WordprocessingML part and yields its paragraphs and table
+    rows in document order. Table cells are joined with " | "; nested tables
+    are folded into the cell that contains them.
+    """
+    from xml.etree.ElementTree import iterparse
+
+    depth = 0
+    fallback = 0  # inside mc:Fallback, a duplicate of content already read
+    in_run = 0    # inside w:r; w:tab also appears in paragraph tab stops
+    runs = []     # stack: text runs of each open paragraph (text boxes nest)
+    cells = []    # stack: paragraphs of each open table cell
+    rows = []     # stack: cells of each open table row
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            depth += 1
+            if tag == MC_FALLBACK:
+                fallback += 1
+            elif fallback:
+                pass
+            elif tag == W + "p":
+                runs.append([])
+            elif tag == W + "r":
+                in_run += 1
+            elif tag == W + "tr":
+                rows.append([])
+            elif tag == W + "tc":
+                cells.append([])
+            continue
+
+        depth -= 1
+        line = None
+        if tag == MC_FALLBACK:
+            fallback -= 1
+        elif fallback:
+            pass
+        elif tag == W + "r":
+            in_run -= 1
+        elif tag == W + "p":
+            line = "".join(runs.pop()).strip()
+        elif tag == W + "tc":
+            rows[-1].append(" ".join(cells.pop()))
+        elif tag == W + "tr":
+            # Keep empty cells so columns stay aligned; skip only empty rows
+            row = rows.pop()
+            line = " | ".join(row) if any(cell.strip() for cell in row) else None
+        elif not (in_run and runs):
+            pass
+        elif tag == W + "t":
+            runs[-1].append(elem.text or "")
+        elif tag == W + "tab":
+            runs[-1].append("\t")
+        elif tag in (W + "br", W + "cr"):
+            runs[-1].append("\n")
+
+        if line:
+            if cells:
+                cells[-1].append(line)
+            else:
+                yield line
+
+        # Drop finished top-level elements so memory stays flat on large files
+        if depth <= 2 and tag != W + "body":
+            elem.clear()
+
+
+def iter_docx_lines(docx_path: str):
+    """
+    Yields the text of a DOCX without building the python-docx object model:
+    headers first, then body paragraphs and table rows in document order,
+    then footnotes, endnotes and footers. Lines repeated across header or
+    footer parts are yielded once.
+    """
+    import zipfile
+
+    with zipfile.ZipFile(docx_path) as archive:
+        names = archive.namelist()
+
+        def parts(kind):
+            pattern = DOCX_PART_PATTERNS[kind]
+            found = [name for name in names if pattern.match(name)]
+            return sorted(found, key=lambda name: int(re.sub(r"\D", "", name) or 0))
+
+        def read(part_names, seen=None):
+            for name in part_names:
+                with archive.open(name) as stream:
+                    for line in _iter_docx_part(stream):
+                        if seen is not None:
+                            if line in seen:
+                                continue
+                            seen.add(line)
+                        yield line
+
+        yield from read(parts("header"), seen=set())
+        yield from read(["word/document.xml"])
+        yield from read(parts("footnotes") + parts("endnotes"))
+        yield from read(parts("footer"), seen=set())
 
 
-# --------- Function to extract text from DOCX ---------
 def extract_text_from_docx(docx_path: str) -> str:
-    doc = Document(docx_path)
-    text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-    return text.strip()
+    return "\n".join(iter_docx_lines(docx_path)).strip()
 
 
 # --------- Function to auto-detect and extract text ---------
@@ -44,17 +309,26 @@ def save_to_txt(text: str, output_path: str):
 
 # --------- Main Program ---------
 if __name__ == "__main__":
+    from contextlib import closing
+    from pathlib import Path
+
+    from document_store import STORE_DB, connect, put_document
+
     # Update file names with what you actually have
     pdf_file = "D:\GenAI Capstone Project\Samlpe policy.pdf"
     docx_file = "sample_policy.docx"   # optional
 
     # Extract from PDF
     if os.path.exists(pdf_file):
-        pdf_text = extract_text(pdf_file)
+        pdf_text, stats = extract_text_from_pdf_with_stats(pdf_file)
+        print(f"🧹 Removed {stats['removed_lines']} repeated header/footer lines "
+              f"({stats['removed_chars']} chars, ~{stats['removed_tokens']} tokens)")
         print("\n--- PDF Extracted Text (First 100000 chars) ---\n")
         print(pdf_text[:500])
         save_to_txt(pdf_text, "GovReport_extracted.txt")
-        print(f"\n✅ Extracted text saved to GovReport_extracted.txt")
+        with closing(connect()) as conn:
+            put_document(conn, os.path.basename(pdf_file), pdf_text, source=Path(pdf_file).read_bytes())
+        print(f"\n✅ Extracted text saved to GovReport_extracted.txt and {STORE_DB}")
     else:
         print(f"{pdf_file} not found!")
 
@@ -64,7 +338,9 @@ if __name__ == "__main__":
         print("\n--- DOCX Extracted Text (First 100000 chars) ---\n")
         print(docx_text[:500])
         save_to_txt(docx_text, "sample_policy_extracted.txt")
-        print(f"\n✅ Extracted text saved to sample_policy_extracted.txt")
+        with closing(connect()) as conn:
+            put_document(conn, os.path.basename(docx_file), docx_text, source=Path(docx_file).read_bytes())
+        print(f"\n✅ Extracted text saved to sample_policy_extracted.txt and {STORE_DB}")
     else:
         print(f"{docx_file} not found!")
 
@@ -0,0 +1,242 @@
+# document_store.py
+"""
+Single-file document store for the pipeline
+Documents, extracted text, chunks and summaries live in one SQLite file,
+keyed by content hash, instead of one .txt file per chunk.
+
+- documents: one row per source document (hash of the source bytes), with
+             its extracted text and the cleaned text its chunks point into
+- chunks:    ordered chunks of a document, each with its own text hash
+- summaries: one summary per chunk hash, provider and model, so identical
+             chunks are only sent to the same model once
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+STORE_DB = Path("simplifier.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    hash        TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    clean_text  TEXT,               -- cleaned text the chunk offsets index
+    created     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    doc_hash    TEXT NOT NULL REFERENCES documents(hash),
+    idx         INTEGER NOT NULL,
+    hash        TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    start       INTEGER,            -- offsets into documents.clean_text
+    end         INTEGER,
+    page_start  INTEGER,
+    page_end    INTEGER,
+    PRIMARY KEY (doc_hash, idx)
+);
+"""
+
+SUMMARIES_TABLE = """
+CREATE TABLE IF NOT EXISTS summaries (
+    chunk_hash  TEXT NOT NULL,
+    provider    TEXT NOT NULL,
+    model       TEXT NOT NULL,      -- '' when unknown (older stores)
+    summary     TEXT NOT NULL,
+    created     REAL NOT NULL,
+    PRIMARY KEY (chunk_hash, provider, model)
+)
+"""
+
+
+def connect(db_path: Path = STORE_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    add_missing_columns(conn, "documents", {"clean_text": "TEXT"})
+    add_missing_columns(conn, "chunks", {"start": "INTEGER", "end": "INTEGER",
+                                         "page_start": "INTEGER", "page_end": "INTEGER"})
+    migrate_summaries(conn)
+    conn.execute(SUMMARIES_TABLE)
+    return conn
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict):
+    """
+    Adds columns introduced after a store file was first created.
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    with conn:
+        for name, column_type in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def content_hash(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def migrate_summaries(conn: sqlite3.Connection):
+    """
+    Re-keys summaries of a store created when they were keyed by chunk hash
+    only. Their model was not recorded and is stored as ''.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(summaries)")}
+    if not columns or "model" in columns:
+        return
+    conn.executescript(f"""
+        BEGIN;
+        ALTER TABLE summaries RENAME TO summaries_old;
+        {SUMMARIES_TABLE};
+        INSERT INTO summaries (chunk_hash, provider, model, summary, created)
+            SELECT chunk_hash, COALESCE(provider, ''), '', summary, created FROM summaries_old;
+        DROP TABLE summaries_old;
+        COMMIT;
+    """)
+
+
+# --------- Documents ---------
+def put_document(conn: sqlite3.Connection, name: str, text: str, source: bytes = None) -> str:
+    """
+    Stores a document's extracted text and returns its hash. The hash is
+    taken from the source file bytes when given, otherwise from the text.
+    """
+    doc_hash = content_hash(source if source is not None else text)
+    with conn:
+        # An update keeps clean_text, which belongs to the stored chunks
+        conn.execute(
+            """INSERT INTO documents (hash, name, text, created) VALUES (?, ?, ?, ?)
+               ON CONFLICT (hash) DO UPDATE SET name = excluded.name, text = excluded.text, created = excluded.created""",
+            (doc_hash, name, text, time.time()),
+        )
+    return doc_hash
+
+
+def get_document(conn: sqlite3.Connection, doc_hash: str) -> dict:
+    row = conn.execute("SELECT * FROM documents WHERE hash = ?", (doc_hash,)).fetchone()
+    return dict(row) if row else None
+
+
+def get_clean_text(conn: sqlite3.Connection, doc_hash: str) -> str:
+    """
+    Returns the cleaned text that the document's chunk offsets point into,
+    or None when its chunks were stored as plain strings.
+    """
+    row = conn.execute("SELECT clean_text FROM documents WHERE hash = ?", (doc_hash,)).fetchone()
+    return row["clean_text"] if row else None
+
+
+def latest_document(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT hash FROM documents ORDER BY created DESC LIMIT 1").fetchone()
+    return row["hash"] if row else None
+
+
+def unchunked_documents(conn: sqlite3.Connection) -> list:
+    return conn.execute(
+        "SELECT * FROM documents WHERE hash NOT IN (SELECT doc_hash FROM chunks) ORDER BY created"
+    ).fetchall()
+
+
+# --------- Chunks ---------
+def _chunk_row(doc_hash: str, idx: int, chunk) -> tuple:
+    # Plain strings carry no provenance; preprocessing.Chunk objects do
+    if isinstance(chunk, str):
+        return doc_hash, idx, content_hash(chunk), chunk, None, None, None, None
+    text = chunk.text
+    return doc_hash, idx, content_hash(text), text, chunk.start, chunk.end, chunk.page_start, chunk.page_end
+
+
+def put_chunks(conn: sqlite3.Connection, doc_hash: str, chunks: list):
+    """
+    Replaces a document's chunks in a single transaction. Chunks can be
+    strings or preprocessing.Chunk objects, whose offsets and pages are kept
+    along with the cleaned text they share.
+    """
+    buffer = next((chunk.buffer for chunk in chunks if not isinstance(chunk, str)), None)
+    with conn:
+        conn.execute("UPDATE documents SET clean_text = ? WHERE hash = ?", (buffer, doc_hash))
+        conn.execute("DELETE FROM chunks WHERE doc_hash = ?", (doc_hash,))
+        conn.executemany(
+            """INSERT INTO chunks (doc_hash, idx, hash, text, start, end, page_start, page_end)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (_chunk_row(doc_hash, i, chunk) for i, chunk in enumerate(chunks, start=1)),
+        )
+
+
+def get_chunks(conn: sqlite3.Connection, doc_hash: str) -> list:
+    """
+    Returns the document's chunks as rows (idx, hash, text, start, end,
+    page_start, page_end) in chunk order.
+    """
+    return conn.execute(
+        "SELECT idx, hash, text, start, end, page_start, page_end FROM chunks WHERE doc_hash = ? ORDER BY idx",
+        (doc_hash,),
+    ).fetchall()
+
+
+# --------- Summaries ---------
+# Lookups take an optional provider and model; None matches any, so a summary
+# is only reused for the provider/model it came from unless the caller allows
+# any (e.g. "auto" routing or exporting the latest results).
+_MATCHING_SUMMARY = """SELECT rowid FROM summaries
+    WHERE chunk_hash = c.hash AND provider = COALESCE(?, provider) AND model = COALESCE(?, model)
+    ORDER BY created DESC LIMIT 1"""
+
+
+def put_summaries(conn: sqlite3.Connection, items: list):
+    """
+    Stores (chunk_hash, summary, provider, model) tuples in a single transaction.
+    """
+    now = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO summaries (chunk_hash, provider, model, summary, created) VALUES (?, ?, ?, ?, ?)",
+            ((chunk_hash, provider, model, summary, now) for chunk_hash, summary, provider, model in items),
+        )
+
+
+def get_summaries(conn: sqlite3.Connection, doc_hash: str, provider: str = None, model: str = None) -> list:
+    """
+    Returns rows (idx, chunk_hash, page_start, page_end, summary, provider,
+    model) in chunk order, using the latest matching summary of each chunk;
+    summary, provider and model are None for chunks without one.
+    """
+    return conn.execute(
+        f"""SELECT c.idx, c.hash AS chunk_hash, c.page_start, c.page_end, s.summary, s.provider, s.model
+            FROM chunks c LEFT JOIN summaries s ON s.rowid = ({_MATCHING_SUMMARY})
+            WHERE c.doc_hash = ? ORDER BY c.idx""",
+        (provider, model, doc_hash),
+    ).fetchall()
+
+
+def pending_chunks(conn: sqlite3.Connection, provider: str = None, model: str = None) -> list:
+    """
+    Returns rows (hash, text) for every distinct chunk in the store that has
+    no matching summary yet, in document and chunk order.
+    """
+    return conn.execute(
+        f"""SELECT c.hash, c.text FROM chunks c
+            JOIN documents d ON d.hash = c.doc_hash
+            WHERE NOT EXISTS ({_MATCHING_SUMMARY})
+            GROUP BY c.hash ORDER BY MIN(d.created), MIN(c.idx)""",
+        (provider, model),
+    ).fetchall()
+
+
+def summary_heading(idx: int, page_start: int = None, page_end: int = None) -> str:
+    from preprocessing import format_pages
+
+    pages = format_pages(page_start, page_end)
+    return f"### Summary of Chunk {idx}" + (f" ({pages})" if pages else "")
+
+
+def merged_summary(conn: sqlite3.Connection, doc_hash: str, provider: str = None, model: str = None) -> str:
+    return "\n\n".join(
+        f"{summary_heading(row['idx'], row['page_start'], row['page_end'])}\n{row['summary']}\n"
+        for row in get_summaries(conn, doc_hash, provider, model) if row["summary"] is not None
+    )
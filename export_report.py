@@ -4,17 +4,14 @@ Step 4 (Part 2): Export merged summary report to PDF and Word
 """
 
 from pathlib import Path
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from docx import Document
-
-# --------- Function to export as PDF ---------
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph
 from xml.sax.saxutils import escape
 
+
+# --------- Function to export as PDF ---------
 def export_to_pdf(text, filename):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+
     doc = SimpleDocTemplate(filename)
     styles = getSampleStyleSheet()
     story = []
@@ -27,6 +24,8 @@ def export_to_pdf(text, filename):
 
 # --------- Function to export as DOCX ---------
 def export_to_docx(input_text: str, output_path: str):
+    from docx import Document
+
     doc = Document()
     for line in input_text.split("\n"):
         if line.startswith("###"):
@@ -38,13 +37,20 @@ def export_to_docx(input_text: str, output_path: str):
 
 # --------- Main Program ---------
 if __name__ == "__main__":
-    input_file = Path("Final_Summary_Report.txt")
+    from contextlib import closing
+
+    from document_store import STORE_DB, connect, latest_document, merged_summary
+
+    with closing(connect()) as conn:
+        doc_hash = latest_document(conn)
+        text = merged_summary(conn, doc_hash) if doc_hash else ""
 
-    if not input_file.exists():
-        print("⚠️ Final_Summary_Report.txt not found. Run merge_summaries.py first.")
+    if not text:
+        print(f"⚠️ No summaries found in {STORE_DB}. Run ai_processing.py first.")
         exit()
 
-    text = input_file.read_text(encoding="utf-8")
+    Path("Final_Summary_Report.txt").write_text(text, encoding="utf-8")
+    print("✅ Merged summaries saved as Final_Summary_Report.txt")
 
     # Export PDF
     export_to_pdf(text, "Final_Summary_Report.pdf")
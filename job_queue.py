@@ -0,0 +1,257 @@
+# job_queue.py
+"""
+Background job queue for the Streamlit apps
+Documents are submitted as jobs, processed by a pool of worker processes,
+and their progress and results are kept in a local SQLite file so any
+session can poll them or come back to them later.
+
+Run a standalone worker pool with:
+    python job_queue.py --workers 4 [--db jobs.db] [--store simplifier.db]
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+from document_store import STORE_DB, add_missing_columns
+
+JOBS_DB = Path("jobs.db")
+UPLOADS_DIR = Path("uploads")
+
+# Characters of the extracted text kept for the "Original" preview
+PREVIEW_CHARS = 2000
+
+# A running job is leased to one worker; the worker renews the lease every
+# HEARTBEAT_SECONDS, and a job whose lease has expired is claimed again
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    file_path   TEXT NOT NULL,
+    provider    TEXT NOT NULL,
+    route       TEXT,               -- provider order for "auto", e.g. groq,gemini
+    status      TEXT NOT NULL,      -- queued, running, done, failed
+    done        INTEGER NOT NULL DEFAULT 0,
+    total       INTEGER NOT NULL DEFAULT 0,
+    preview     TEXT,
+    extract_stats TEXT,
+    result      TEXT,
+    served_by   TEXT,
+    doc_hash    TEXT,
+    error       TEXT,
+    worker      TEXT,               -- lease holder while running
+    created     REAL NOT NULL,
+    updated     REAL NOT NULL       -- also the lease heartbeat
+)
+"""
+
+
+def connect(db_path: Path = JOBS_DB) -> sqlite3.Connection:
+    # Autocommit mode; claims use explicit BEGIN IMMEDIATE transactions
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SCHEMA)
+    add_missing_columns(conn, "jobs", {"doc_hash": "TEXT", "worker": "TEXT", "route": "TEXT"})
+    return conn
+
+
+# --------- Client side ---------
+def save_upload(name: str, data: bytes) -> Path:
+    """
+    Stores an uploaded file under a unique name so concurrent uploads with
+    the same file name don't overwrite each other.
+    """
+    UPLOADS_DIR.mkdir(exist_ok=True)
+    path = UPLOADS_DIR / f"{uuid.uuid4().hex[:8]}_{Path(name).name}"
+    path.write_bytes(data)
+    return path
+
+
+def submit_job(file_path: str, provider: str = "ollama", db_path: Path = JOBS_DB, route: str = None) -> str:
+    """
+    Queues a document. With provider "auto", chunks are routed through
+    `route` (comma-separated provider names, default providers.ROUTE_ORDER).
+    """
+    from providers import PROVIDERS
+
+    if route and provider != "auto":
+        raise ValueError("A route can only be given with provider 'auto'.")
+    # "groq, gemini" and "groq,gemini" are the same route
+    names = [name.strip() for name in route.split(",") if name.strip()] if route else []
+    if route and not names:
+        raise ValueError(f"Invalid route '{route}'.")
+    for name in names if provider == "auto" else [provider]:
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown provider '{name}'. Choose from: auto, {', '.join(PROVIDERS)}")
+    route = ",".join(names) or None
+
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with closing(connect(db_path)) as conn:
+        conn.execute(
+            """INSERT INTO jobs (id, file_path, provider, route, status, created, updated)
+               VALUES (?, ?, ?, ?, 'queued', ?, ?)""",
+            (job_id, str(file_path), provider, route, now, now),
+        )
+    return job_id
+
+
+def get_job(job_id: str, db_path: Path = JOBS_DB) -> dict:
+    with closing(connect(db_path)) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+# --------- Worker side ---------
+def _worker_id() -> str:
+    return str(os.getpid())
+
+
+def _claim_job(conn: sqlite3.Connection):
+    """
+    Leases the oldest queued job, or a running job whose worker stopped
+    renewing its lease (e.g. it died), to this worker.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            """SELECT * FROM jobs
+               WHERE status = 'queued' OR (status = 'running' AND updated < ?)
+               ORDER BY created LIMIT 1""",
+            (now - LEASE_SECONDS,),
+        ).fetchone()
+        if row:
+            conn.execute("UPDATE jobs SET status = 'running', done = 0, worker = ?, updated = ? WHERE id = ?",
+                         (_worker_id(), now, row["id"]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def _update(conn: sqlite3.Connection, job_id: str, **fields):
+    # Only the lease holder may write; a worker that lost its lease is ignored
+    fields["updated"] = time.time()
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    conn.execute(f"UPDATE jobs SET {columns} WHERE id = ? AND worker = ?", (*fields.values(), job_id, _worker_id()))
+
+
+def _heartbeat(db_path: Path, job_id: str, stop: threading.Event):
+    with closing(connect(db_path)) as conn:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            conn.execute("UPDATE jobs SET updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                         (time.time(), job_id, _worker_id()))
+
+
+def _run_job(conn: sqlite3.Connection, job, store_path: Path = STORE_DB):
+    import json
+
+    import document_store
+    from document_ingestion import extract_text, extract_text_from_pdf_with_stats
+    from preprocessing import chunk_document
+    from providers import ROUTE_ORDER, process_chunk, route_chunk, summary_key
+
+    if job["file_path"].lower().endswith(".pdf"):
+        raw_text, stats = extract_text_from_pdf_with_stats(job["file_path"])
+    else:
+        raw_text, stats = extract_text(job["file_path"]), None
+
+    # Chunks and summaries go through the document store, so chunks that were
+    # already summarized by the job's provider (in this or any earlier
+    # document) are not sent again
+    with closing(document_store.connect(store_path)) as store:
+        source = Path(job["file_path"])
+        doc_hash = document_store.put_document(store, source.name, raw_text, source=source.read_bytes())
+        document_store.put_chunks(store, doc_hash, chunk_document(raw_text))
+        chunks = document_store.get_summaries(store, doc_hash, *summary_key(job["provider"]))
+        texts = {row["hash"]: row["text"] for row in document_store.get_chunks(store, doc_hash)}
+        _update(conn, job["id"], total=len(chunks), preview=raw_text[:PREVIEW_CHARS], doc_hash=doc_hash,
+                extract_stats=json.dumps(stats) if stats else None)
+
+        summaries, served_by, fresh = [], [], {}
+        for chunk in chunks:
+            i, chunk_hash = chunk["idx"], chunk["chunk_hash"]
+            if chunk["summary"] is not None:
+                summary, served = chunk["summary"], chunk["provider"]
+            elif chunk_hash in fresh:
+                summary, served = fresh[chunk_hash]
+            else:
+                try:
+                    if job["provider"] == "auto":
+                        order = tuple(job["route"].split(",")) if job["route"] else ROUTE_ORDER
+                        summary, served = route_chunk(texts[chunk_hash], order=order)
+                    else:
+                        summary, served = process_chunk(texts[chunk_hash], provider=job["provider"]), job["provider"]
+                    fresh[chunk_hash] = summary, served
+                    document_store.put_summaries(store, [(chunk_hash, summary, *summary_key(served))])
+                except Exception as e:
+                    summary, served = f"⚠️ Error processing chunk: {e}", None
+            heading = document_store.summary_heading(i, chunk["page_start"], chunk["page_end"])
+            summaries.append(f"{heading}\n{summary}\n")
+            served_by.append(served)
+            _update(conn, job["id"], done=i)
+
+    _update(conn, job["id"], status="done", result="\n\n".join(summaries), served_by=json.dumps(served_by))
+
+
+def worker_loop(db_path: Path = JOBS_DB, poll_interval: float = 1.0, store_path: Path = STORE_DB):
+    conn = connect(db_path)
+    while True:
+        job = _claim_job(conn)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        # Keep the lease alive while a slow chunk is being processed
+        stop = threading.Event()
+        threading.Thread(target=_heartbeat, args=(db_path, job["id"], stop), daemon=True).start()
+        try:
+            _run_job(conn, job, store_path)
+        except Exception as e:
+            _update(conn, job["id"], status="failed", error=str(e))
+        finally:
+            stop.set()
+
+
+def start_workers(count: int = 2, db_path: Path = JOBS_DB, store_path: Path = STORE_DB) -> list:
+    """
+    Starts `count` worker processes that take jobs from `db_path` and keep
+    documents, chunks and summaries in the store at `store_path`. Several
+    pools (each app, or a standalone one) can share a jobs file; jobs of a
+    pool that died are picked up again once their lease expires.
+    """
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for _ in range(count):
+        process = context.Process(target=worker_loop, args=(db_path,), kwargs={"store_path": store_path}, daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+# --------- Main Program ---------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the background worker pool")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--db", default=str(JOBS_DB), help="jobs file")
+    parser.add_argument("--store", default=str(STORE_DB), help="document store file")
+    args = parser.parse_args()
+
+    workers = start_workers(args.workers, Path(args.db), Path(args.store))
+    print(f"✅ {len(workers)} workers processing jobs from {args.db} into {args.store} (Ctrl+C to stop)")
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping workers")
@@ -5,7 +5,11 @@ Clean and chunk extracted text
 """
 
 import re
-from pathlib import Path
+from bisect import bisect_right
+
+# Extracted PDF text ends every page with a form feed, like pdftotext
+PAGE_BREAK = "\f"
+
 
 # --------- Function to clean text ---------
 def clean_text(text: str) -> str:
@@ -16,44 +20,142 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+# --------- Function to clean text page by page ---------
+def clean_pages(text: str) -> tuple:
+    """
+    Cleans text whose pages end with PAGE_BREAK. Returns the cleaned text and
+    the offset where each page starts in it, or None for the page starts when
+    the text has no page breaks (e.g. DOCX). Blank pages keep their number.
+    """
+    if PAGE_BREAK not in text:
+        return clean_text(text), None
+
+    pages = text.split(PAGE_BREAK)
+    if pages[-1] == "":
+        pages.pop()  # nothing follows the last page's break
+
+    pieces, page_starts, offset = [], [], 0
+    for page in pages:
+        part = clean_text(page)
+        if part and pieces:
+            offset += 1  # the space joining two pages
+        page_starts.append(offset)
+        if part:
+            pieces.append(part)
+            offset += len(part)
+    return " ".join(pieces), page_starts
+
+
+def format_pages(page_start: int, page_end: int) -> str:
+    if page_start is None:
+        return ""
+    if page_start == page_end:
+        return f"page {page_start}"
+    return f"pages {page_start}-{page_end}"
+
+
+# --------- Compact chunk type ---------
+class Chunk:
+    """
+    A chunk stored as [start, end) offsets into one shared text buffer, with
+    the pages it spans. The text itself is only sliced out when asked for,
+    so overlapping chunks don't keep their own copies.
+    """
+
+    __slots__ = ("buffer", "start", "end", "page_start", "page_end")
+
+    def __init__(self, buffer: str, start: int, end: int, page_start: int = None, page_end: int = None):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.page_start = page_start
+        self.page_end = page_end
+
+    @property
+    def text(self) -> str:
+        return self.buffer[self.start:self.end]
+
+    @property
+    def pages(self) -> str:
+        return format_pages(self.page_start, self.page_end)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Chunk({self.start}:{self.end}{', ' + self.pages if self.pages else ''})"
+
+
 # --------- Function to split text into chunks ---------
-def split_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> list:
+def split_chunks(text: str, chunk_size: int = 1200, overlap: int = 200, page_starts: list = None) -> list:
     """
-    Splits text into chunks of `chunk_size` characters with `overlap` for context.
+    Splits text into Chunk objects of `chunk_size` characters with `overlap`
+    for context. Offsets exclude leading/trailing spaces, matching the
+    stripped strings returned by split_text. `page_starts` (from clean_pages)
+    adds 1-based page numbers to every chunk.
     """
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("chunk_size must be positive and overlap between 0 and chunk_size - 1")
     chunks = []
     start = 0
     while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk.strip())
+        end = min(start + chunk_size, len(text))
+        chunk_start, chunk_end = start, end
+        while chunk_start < chunk_end and text[chunk_start].isspace():
+            chunk_start += 1
+        while chunk_end > chunk_start and text[chunk_end - 1].isspace():
+            chunk_end -= 1
+
+        page_start = page_end = None
+        if page_starts:
+            page_start = bisect_right(page_starts, chunk_start)
+            page_end = bisect_right(page_starts, max(chunk_start, chunk_end - 1))
+        chunks.append(Chunk(text, chunk_start, chunk_end, page_start, page_end))
         start += chunk_size - overlap
     return chunks
 
 
+def split_text(text: str, chunk_size: int = 1200, overlap: int = 200) -> list:
+    """
+    Splits text into chunks of `chunk_size` characters with `overlap` for context.
+    """
+    return [chunk.text for chunk in split_chunks(text, chunk_size, overlap)]
+
+
+def chunk_document(raw_text: str, chunk_size: int = 1200, overlap: int = 200) -> list:
+    """
+    Cleans extracted text and splits it into Chunk objects that all share
+    the cleaned text and carry their page numbers.
+    """
+    cleaned_text, page_starts = clean_pages(raw_text)
+    return split_chunks(cleaned_text, chunk_size, overlap, page_starts)
+
+
 # --------- Main Program ---------
 if __name__ == "__main__":
-    input_file = Path("GovReport_extracted.txt")
+    from contextlib import closing
 
-    if input_file.exists():
-        raw_text = input_file.read_text(encoding="utf-8")
-        cleaned_text = clean_text(raw_text)
+    from document_store import STORE_DB, connect, put_chunks, unchunked_documents
 
-        # Split into chunks
-        chunks = split_text(cleaned_text, chunk_size=1200, overlap=200)
+    with closing(connect()) as conn:
+        documents = unchunked_documents(conn)
+        if not documents:
+            print(f"⚠️ No new documents in {STORE_DB}. Run document_ingestion.py first.")
 
-        print(f"✅ Cleaned text length: {len(cleaned_text)} chars")
-        print(f"✅ Split into {len(chunks)} chunks")
+        for document in documents:
+            # Clean and split into chunks that share the cleaned text
+            chunks = chunk_document(document["text"], chunk_size=1200, overlap=200)
 
-        print("\n--- First Chunk Preview (First 100000 chars) ---\n")
-        print(chunks[0][:500])
+            print(f"\n📄 {document['name']}")
+            print(f"✅ Cleaned text length: {len(chunks[0].buffer) if chunks else 0} chars")
+            print(f"✅ Split into {len(chunks)} chunks")
 
-        # Save chunks into separate files
-        output_dir = Path("chunks")
-        output_dir.mkdir(exist_ok=True)
-        for i, chunk in enumerate(chunks, start=1):
-            (output_dir / f"chunk_{i}.txt").write_text(chunk, encoding="utf-8")
+            print("\n--- First Chunk Preview (First 100000 chars) ---\n")
+            print(chunks[0].text[:500] if chunks else "")
 
-        print(f"\n✅ {len(chunks)} chunks saved in 'chunks/' folder")
-    else:
-        print(f"{input_file} not found!")
+            # Save all chunks in one transaction
+            put_chunks(conn, document["hash"], chunks)
+            print(f"\n✅ {len(chunks)} chunks saved in {STORE_DB}")
@@ -0,0 +1,264 @@
+# providers.py
+"""
+Model providers for the simplifier pipeline
+Each backend imports its SDK only when it is first used
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+PROMPT_TEMPLATE = """
+    You are a legal document simplifier. Read the following text and:
+    1. Summarize it in plain, simple English.
+    2. List obligations, rights, risks, penalties, and critical dates clearly.
+
+    Text:
+    {chunk}
+    """
+
+DEFAULT_MODELS = {
+    "gemini": "gemini-1.5-flash",
+    "groq": "llama-3.1-8b-instant",
+    "ollama": "phi",
+}
+
+# Every request gives up after this many seconds, so a hung provider can't
+# hold a routing thread forever
+REQUEST_TIMEOUT = 60.0
+
+# Clients are created on first use and reused afterwards
+_clients = {}
+
+
+def build_prompt(chunk: str) -> str:
+    return PROMPT_TEMPLATE.format(chunk=chunk)
+
+
+# --------- Gemini ---------
+def _gemini_client():
+    if "gemini" not in _clients:
+        import google.generativeai as genai
+
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("⚠️ GOOGLE_API_KEY not found. Set it before running the script.")
+        genai.configure(api_key=api_key)
+        _clients["gemini"] = genai
+    return _clients["gemini"]
+
+
+def process_chunk_with_gemini(chunk: str, model_name: str = DEFAULT_MODELS["gemini"]) -> str:
+    genai = _gemini_client()
+    model = genai.GenerativeModel(model_name)
+    response = model.generate_content(build_prompt(chunk), request_options={"timeout": REQUEST_TIMEOUT})
+    return response.text.strip()
+
+
+# --------- Groq (OpenAI-compatible) ---------
+def _groq_client():
+    if "groq" not in _clients:
+        from openai import OpenAI
+
+        _clients["groq"] = OpenAI(base_url="https://api.groq.com/openai/v1",
+                                  api_key=os.getenv("GROQ_API_KEY"), timeout=REQUEST_TIMEOUT)
+    return _clients["groq"]
+
+
+def process_chunk_with_groq(chunk: str, model_name: str = DEFAULT_MODELS["groq"]) -> str:
+    client = _groq_client()
+    response = client.chat.completions.create(
+        model=model_name,
+        messages=[{"role": "user", "content": build_prompt(chunk)}],
+        temperature=0.3,
+    )
+    return response.choices[0].message.content.strip()
+
+
+# --------- Local Ollama ---------
+def _ollama_client():
+    if "ollama" not in _clients:
+        import ollama
+
+        _clients["ollama"] = ollama.Client(timeout=REQUEST_TIMEOUT)
+    return _clients["ollama"]
+
+
+def process_chunk_with_ollama(chunk: str, model_name: str = DEFAULT_MODELS["ollama"]) -> str:
+    client = _ollama_client()
+    response = client.chat(model=model_name, messages=[{"role": "user", "content": build_prompt(chunk)}])
+    return response["message"]["content"].strip()
+
+
+PROVIDERS = {
+    "gemini": process_chunk_with_gemini,
+    "groq": process_chunk_with_groq,
+    "ollama": process_chunk_with_ollama,
+}
+
+
+def process_chunk(chunk: str, provider: str = "ollama", model_name: str = None) -> str:
+    """
+    Sends a chunk to the named provider and returns the simplified output.
+    """
+    if provider == "auto":
+        if model_name:
+            raise ValueError("A model can't be chosen for provider 'auto'; each provider uses its default.")
+        return route_chunk(chunk)[0]
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider '{provider}'. Choose from: {', '.join(PROVIDERS)}")
+    if model_name:
+        return PROVIDERS[provider](chunk, model_name=model_name)
+    return PROVIDERS[provider](chunk)
+
+
+def summary_key(provider: str, model_name: str = None) -> tuple:
+    """
+    Returns the (provider, model) a stored summary must come from to be reused
+    for this request. "auto" accepts a summary from any provider and model.
+    """
+    if provider == "auto":
+        return None, None
+    return provider, model_name or DEFAULT_MODELS[provider]
+
+
+# --------- Routing: hedged requests & failover ---------
+ROUTE_ORDER = ("groq", "gemini", "ollama")
+
+# Hedge to the next provider once the current one is slower than this
+# percentile of its own recent latencies, but never wait longer than
+# HEDGE_MAX_DELAY
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 5.0  # seconds, used until enough samples are recorded
+HEDGE_MAX_DELAY = 10.0
+
+# A provider whose median over its last HEDGE_MIN_SAMPLES calls is more
+# than DRIFT_FACTOR times its long-run median has slowed down; it is put on
+# cooldown instead of letting its own percentile rise with it
+DRIFT_FACTOR = 3.0
+DRIFT_MIN_SAMPLES = 20
+
+# Providers that report quota/rate limits are skipped for a while
+QUOTA_COOLDOWN = 60.0
+QUOTA_MARKERS = ("429", "quota", "rate limit", "resource exhausted", "resourceexhausted")
+
+# Each call runs on its own thread, so requests that lose a race can't queue
+# up in front of new ones; a provider with this many calls still running is
+# skipped until some of them finish or time out
+MAX_IN_FLIGHT = 4
+
+_latencies = {name: deque(maxlen=200) for name in PROVIDERS}
+_cooldown_until = {}
+_in_flight = {name: 0 for name in PROVIDERS}
+_lock = threading.Lock()
+
+
+def hedge_delay(provider: str) -> float:
+    samples = sorted(_latencies[provider])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    index = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))
+    return min(samples[index], HEDGE_MAX_DELAY)
+
+
+def _median(values) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _record_latency(provider: str, seconds: float):
+    samples = _latencies[provider]
+    with _lock:
+        samples.append(seconds)
+        if len(samples) < DRIFT_MIN_SAMPLES:
+            return
+        recent = list(samples)[-HEDGE_MIN_SAMPLES:]
+        if _median(recent) > DRIFT_FACTOR * _median(samples):
+            # Forget the slow calls so the provider is judged afresh after the cooldown
+            for _ in recent:
+                samples.pop()
+            _cooldown_until[provider] = time.monotonic() + QUOTA_COOLDOWN
+
+
+def _timed_call(provider: str, chunk: str) -> str:
+    start = time.perf_counter()
+    result = PROVIDERS[provider](chunk)
+    _record_latency(provider, time.perf_counter() - start)
+    return result
+
+
+def _submit(provider: str, chunk: str) -> Future:
+    """
+    Starts a provider call on its own daemon thread and returns its future.
+    """
+    future = Future()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(_timed_call(provider, chunk))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _lock:
+                _in_flight[provider] -= 1
+
+    with _lock:
+        _in_flight[provider] += 1
+    threading.Thread(target=run, name=f"provider-{provider}", daemon=True).start()
+    return future
+
+
+def _is_quota_error(error: Exception) -> bool:
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in QUOTA_MARKERS)
+
+
+def route_chunk(chunk: str, order: tuple = ROUTE_ORDER) -> tuple:
+    """
+    Sends a chunk through the providers in `order` and returns
+    (simplified_text, provider_name) from whichever answers first.
+
+    - If the current provider is slower than its latency percentile (capped
+      at HEDGE_MAX_DELAY), a duplicate (hedged) request goes to the next
+      provider as well.
+    - On an error the next provider is tried right away; quota or rate-limit
+      errors, and a provider that has become much slower than usual, put
+      that provider on cooldown.
+    - Providers on cooldown or with MAX_IN_FLIGHT calls still running are
+      skipped, unless no provider is left.
+    Requests that lose the race are left to finish (or time out) on their
+    own threads.
+    """
+    now = time.monotonic()
+    candidates = [name for name in order
+                  if _cooldown_until.get(name, 0) <= now and _in_flight[name] < MAX_IN_FLIGHT] or list(order)
+    pending, errors = {}, []
+
+    def launch_next():
+        name = candidates.pop(0)
+        pending[_submit(name, chunk)] = name
+        return name
+
+    latest = launch_next()
+    while pending:
+        timeout = hedge_delay(latest) if candidates else None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            latest = launch_next()  # primary is slow: hedge
+            continue
+        for future in done:
+            name = pending.pop(future)
+            try:
+                return future.result(), name
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                if _is_quota_error(e):
+                    _cooldown_until[name] = time.monotonic() + QUOTA_COOLDOWN
+                if candidates and not pending:
+                    latest = launch_next()  # fail over
+
+    raise RuntimeError("All providers failed: " + "; ".join(errors))
@@ -0,0 +1,276 @@
+# simplifier.py
+"""
+Command-line entry point for the whole pipeline:
+
+    python simplifier.py ingest   contract.pdf
+    python simplifier.py chunk
+    python simplifier.py summarize --provider groq
+    python simplifier.py export
+    python simplifier.py batch    a.pdf b.docx --provider gemini
+
+Each stage imports its heavy libraries (PyMuPDF, python-docx, reportlab, the
+provider SDKs) only when it actually runs, so `--help` and unrelated stages
+start fast. Every stage reads and writes the same document store
+(simplifier.db, see document_store.py). Use `--startup-time` to check the
+CLI against its import budget.
+"""
+
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import sys
+from pathlib import Path
+
+# Budget for importing this module and building the parser, in milliseconds
+IMPORT_BUDGET_MS = 150
+
+# Summaries are written to the store in batches of this size
+SUMMARY_BATCH = 20
+
+# "auto" routes each chunk through --route with hedging and failover
+PROVIDER_CHOICES = ("auto", "gemini", "groq", "ollama")
+
+
+# --------- Helpers ---------
+def _store(args):
+    from contextlib import closing
+
+    from document_store import connect
+
+    return closing(connect(Path(args.db)))
+
+
+def _doc_hash(conn, args) -> str:
+    from document_store import latest_document
+
+    doc_hash = args.doc or latest_document(conn)
+    if not doc_hash:
+        raise SystemExit("⚠️ No documents in the store. Run the ingest stage first.")
+    return doc_hash
+
+
+def _summarize_document(conn, doc_hash: str, provider: str, model_name: str = None, route: tuple = None):
+    """
+    Summarizes every chunk of a document that has no stored summary from the
+    requested provider and model yet ("auto" reuses any). Identical chunks are
+    summarized once; results are written in batches.
+    """
+    from document_store import get_chunks, get_summaries, put_summaries
+    from providers import ROUTE_ORDER, process_chunk, route_chunk, summary_key
+
+    rows = get_summaries(conn, doc_hash, *summary_key(provider, model_name))
+    pending = {}
+    for row in rows:
+        if row["summary"] is None:
+            pending.setdefault(row["chunk_hash"], row["idx"])
+    texts = {row["hash"]: row["text"] for row in get_chunks(conn, doc_hash)}
+    print(f"Found {len(rows)} chunks, {len(rows) - len(pending)} already summarized or repeated. "
+          f"Processing with {provider}...")
+
+    batch = []
+    for chunk_hash, i in pending.items():
+        for attempt in range(3):
+            try:
+                if provider == "auto":
+                    summary, served = route_chunk(texts[chunk_hash], order=route or ROUTE_ORDER)
+                else:
+                    summary, served = process_chunk(texts[chunk_hash], provider=provider, model_name=model_name), provider
+                batch.append((chunk_hash, summary, *summary_key(served, model_name)))
+                print(f"✅ Processed chunk {i}/{len(rows)} via {served}")
+                break
+            except Exception as e:
+                print(f"❌ Error processing chunk {i}, attempt {attempt+1}: {e}")
+                time.sleep(3)
+        else:
+            print(f"⚠️ Failed to process chunk {i} after 3 attempts.")
+
+        if len(batch) >= SUMMARY_BATCH:
+            put_summaries(conn, batch)
+            batch = []
+    put_summaries(conn, batch)
+
+
+def _route(value: str) -> tuple:
+    route = tuple(name.strip() for name in value.split(",") if name.strip())
+    unknown = [name for name in route if name not in PROVIDER_CHOICES[1:]]
+    if not route or unknown:
+        raise argparse.ArgumentTypeError(f"invalid route '{value}'")
+    return route
+
+
+# --------- Subcommands ---------
+def cmd_ingest(args):
+    from document_ingestion import extract_text, extract_text_from_pdf_with_stats, save_to_txt
+    from document_store import put_document
+
+    if Path(args.file).suffix.lower() == ".pdf":
+        text, stats = extract_text_from_pdf_with_stats(args.file)
+        print(f"🧹 Removed {stats['removed_lines']} repeated header/footer lines "
+              f"({stats['removed_chars']} chars, ~{stats['removed_tokens']} tokens)")
+    else:
+        text = extract_text(args.file)
+    if args.output:
+        save_to_txt(text, args.output)
+
+    with _store(args) as conn:
+        doc_hash = put_document(conn, Path(args.file).name, text, source=Path(args.file).read_bytes())
+    print(f"✅ Extracted {len(text)} chars from {args.file} (document {doc_hash[:12]})")
+
+
+def cmd_chunk(args):
+    from document_store import get_document, put_chunks, put_document
+    from preprocessing import chunk_document
+
+    with _store(args) as conn:
+        if args.input:
+            # Plain text extracted elsewhere can be added to the store directly
+            doc_hash = put_document(conn, Path(args.input).name, Path(args.input).read_text(encoding="utf-8"))
+        else:
+            doc_hash = _doc_hash(conn, args)
+        document = get_document(conn, doc_hash)
+        chunks = chunk_document(document["text"], chunk_size=args.chunk_size, overlap=args.overlap)
+        put_chunks(conn, doc_hash, chunks)
+    print(f"✅ {len(chunks)} chunks of {document['name']} saved in {args.db}")
+
+
+def cmd_summarize(args):
+    with _store(args) as conn:
+        doc_hash = _doc_hash(conn, args)
+        _summarize_document(conn, doc_hash, args.provider, args.model, args.route)
+    print(f"\n🎉 Summaries saved in {args.db}")
+
+
+def cmd_export(args):
+    from document_store import merged_summary
+
+    with _store(args) as conn:
+        text = merged_summary(conn, _doc_hash(conn, args))
+    if not text:
+        print("⚠️ No summaries found. Run the summarize stage first.")
+        return 1
+
+    output = Path(args.output)
+    if "txt" in args.formats:
+        output.with_suffix(".txt").write_text(text, encoding="utf-8")
+        print(f"✅ Exported report as {output.with_suffix('.txt')}")
+    if "pdf" in args.formats:
+        from export_report import export_to_pdf
+
+        export_to_pdf(text, str(output.with_suffix(".pdf")))
+        print(f"✅ Exported report as {output.with_suffix('.pdf')}")
+    if "docx" in args.formats:
+        from export_report import export_to_docx
+
+        export_to_docx(text, str(output.with_suffix(".docx")))
+        print(f"✅ Exported report as {output.with_suffix('.docx')}")
+
+
+def cmd_batch(args):
+    from document_ingestion import extract_text
+    from document_store import merged_summary, put_chunks, put_document
+    from preprocessing import chunk_document
+    from providers import summary_key
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(exist_ok=True)
+    with _store(args) as conn:
+        for file in args.files:
+            print(f"\n📄 {file}")
+            text = extract_text(file)
+            doc_hash = put_document(conn, Path(file).name, text, source=Path(file).read_bytes())
+            put_chunks(conn, doc_hash, chunk_document(text))
+            _summarize_document(conn, doc_hash, args.provider, args.model, args.route)
+            report = output_dir / f"{Path(file).stem}_summary.txt"
+            text = merged_summary(conn, doc_hash, *summary_key(args.provider, args.model))
+            report.write_text(text, encoding="utf-8")
+            print(f"✅ Summary saved to {report}")
+
+
+def cmd_worker(args):
+    from job_queue import start_workers
+
+    workers = start_workers(args.workers, Path(args.jobs), Path(args.db))
+    print(f"✅ {len(workers)} workers processing jobs from {args.jobs} into {args.db} (Ctrl+C to stop)")
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping workers")
+
+
+# --------- Argument parsing ---------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="simplifier", description="AI-Powered Contract & Policy Simplifier")
+    parser.add_argument("--db", default="simplifier.db", help="document store file (default: simplifier.db)")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="print how long the CLI took to load and compare it to the import budget")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("ingest", help="extract text from a PDF or DOCX into the store")
+    p.add_argument("file")
+    p.add_argument("-o", "--output", help="also save the extracted text to this .txt file")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("chunk", help="clean a stored document and split it into chunks")
+    p.add_argument("input", nargs="?", help="add this .txt file to the store and chunk it instead")
+    p.add_argument("--doc", help="document hash (default: the most recently ingested)")
+    p.add_argument("--chunk-size", type=int, default=1200)
+    p.add_argument("--overlap", type=int, default=200)
+    p.set_defaults(func=cmd_chunk)
+
+    p = sub.add_parser("summarize", help="simplify every chunk with a model provider")
+    p.add_argument("--doc", help="document hash (default: the most recently ingested)")
+    p.add_argument("--provider", choices=PROVIDER_CHOICES, default="ollama")
+    p.add_argument("--model", help="override the provider's default model (not with --provider auto)")
+    p.add_argument("--route", type=_route, help="provider order for --provider auto, e.g. groq,gemini,ollama")
+    p.set_defaults(func=cmd_summarize)
+
+    p = sub.add_parser("export", help="export the merged summary report to TXT, PDF and Word")
+    p.add_argument("--doc", help="document hash (default: the most recently ingested)")
+    p.add_argument("-o", "--output", default="Final_Summary_Report")
+    p.add_argument("--formats", nargs="+", choices=("txt", "pdf", "docx"), default=["txt", "pdf", "docx"])
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("batch", help="run the whole pipeline on one or more documents")
+    p.add_argument("files", nargs="+")
+    p.add_argument("-o", "--output-dir", default="batch_summaries")
+    p.add_argument("--provider", choices=PROVIDER_CHOICES, default="ollama")
+    p.add_argument("--model", help="override the provider's default model (not with --provider auto)")
+    p.add_argument("--route", type=_route, help="provider order for --provider auto, e.g. groq,gemini,ollama")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("worker", help="run the background worker pool used by the Streamlit apps")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--jobs", default="jobs.db", help="jobs file (default: jobs.db)")
+    p.set_defaults(func=cmd_worker)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Routed chunks use each provider's default model
+    if getattr(args, "provider", None) == "auto" and args.model:
+        parser.error("--model cannot be combined with --provider auto")
+    if getattr(args, "route", None) and args.provider != "auto":
+        parser.error("--route requires --provider auto")
+    if args.command == "chunk" and not 0 <= args.overlap < args.chunk_size:
+        parser.error("--chunk-size must be positive and --overlap between 0 and --chunk-size - 1")
+
+    if args.startup_time:
+        elapsed_ms = (time.perf_counter() - _START) * 1000
+        status = "✅ within" if elapsed_ms <= IMPORT_BUDGET_MS else "⚠️ over"
+        print(f"{status} import budget: {elapsed_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+
+    if not args.command:
+        if not args.startup_time:
+            parser.print_help()
+        return 0
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())